@@ -17,15 +17,32 @@ else
     ARCH="x64"
 fi
 
+# Microsecond timestamp into $now without forking when bash provides one
+now_us() {
+    if [ -n "$EPOCHREALTIME" ]; then
+        now=${EPOCHREALTIME/[.,]/}
+    else
+        now=$(( $(date +%s%N) / 1000 ))
+    fi
+}
+
 echo "Platform: Linux $ARCH"
-echo "Date: $(date)"
+# Run timestamps, taken once so the console, report and file name agree
+run_date=$(date)
+timestamp=$(date '+%Y-%m-%d_%H-%M-%S')
+echo "Date: $run_date"
+
+# System information (collected once, reused in the report)
+sys_distro=$(awk -F'"' '/^PRETTY_NAME=/ {print $2; exit}' /etc/os-release)
+sys_kernel=$(uname -r)
+sys_cpu="$(nproc) cores - $(awk '/^model name/ {sub(/^[^:]*: */, ""); print; exit}' /proc/cpuinfo)"
+sys_memory=$(free -h | awk '/^Mem:/ {print $2}')
 
-# System information
 echo -e "\n🖥️ System Information:"
-echo "Distribution: $(cat /etc/os-release | grep PRETTY_NAME | cut -d'"' -f2)"
-echo "Kernel: $(uname -r)"
-echo "CPU: $(nproc) cores - $(cat /proc/cpuinfo | grep 'model name' | head -1 | cut -d':' -f2 | sed 's/^ *//')"
-echo "Memory: $(free -h | awk '/^Mem:/ {print $2}')"
+echo "Distribution: $sys_distro"
+echo "Kernel: $sys_kernel"
+echo "CPU: $sys_cpu"
+echo "Memory: $sys_memory"
 
 # Build optimized release
 echo -e "\n🔨 Building optimized release for $RUNTIME..."
@@ -41,66 +58,136 @@ fi
 
 APP_PATH="bin/Release/net8.0/$RUNTIME/publish/PocketFence-AI"
 
+# Test sizes
+STARTUP_RUNS=10
+RESOURCE_SAMPLES=20  # One per second
+
 # Check file size
 echo -e "\n📦 Application Size:"
 file_size_bytes=$(stat -c%s "$APP_PATH")
 file_size_mb=$(echo "scale=2; $file_size_bytes / 1024 / 1024" | bc)
 echo "${file_size_mb}MB"
 
+# App stdio: the startup loop reads the ready banner through one FIFO; every
+# launch gets the other as stdin, held open but never written, so the prompt
+# blocks on input instead of spinning on EOF from /dev/null
+ready_fifo="${TMPDIR:-/tmp}/pocketfence-ready.$$"
+input_fifo="${TMPDIR:-/tmp}/pocketfence-input.$$"
+rm -f "$ready_fifo" "$input_fifo"
+mkfifo "$ready_fifo" "$input_fifo"
+trap 'rm -f "$ready_fifo" "$input_fifo"' EXIT
+exec 4<>"$input_fifo"
+
+# Block on fd 3 until the "Ready!" banner arrives; fails if the app exits first
+# or the banner has not shown up within about 5s overall (SECONDS is whole seconds)
+wait_for_ready() {
+    local line
+    local deadline=$((SECONDS + 5))
+    while [ $SECONDS -lt $deadline ] && IFS= read -r -t $((deadline - SECONDS)) line <&3; do
+        case "$line" in
+            *"Ready!"*) return 0 ;;
+        esac
+    done
+    return 1
+}
+
+# summarize <decimal places> <sample>...
+# Summarizes the samples in one sorted pass; sets stat_avg, stat_min, stat_max,
+# stat_p50 and stat_p95 (all "N/A" when there are no samples). Percentiles
+# interpolate linearly between neighbouring ranks, like numpy.percentile.
+summarize() {
+    local places=$1
+    shift
+    if [ $# -eq 0 ]; then
+        stat_avg="N/A" stat_min="N/A" stat_max="N/A" stat_p50="N/A" stat_p95="N/A"
+        return
+    fi
+    read -r stat_avg stat_min stat_max stat_p50 stat_p95 <<< "$(printf '%s\n' "$@" | sort -n | awk -v f="%.${places}f" '
+        function pct(p,    h, lo) {
+            h = (NR - 1) * p
+            lo = int(h) + 1
+            if (lo >= NR) return v[NR]
+            return v[lo] + (h - int(h)) * (v[lo + 1] - v[lo])
+        }
+        { v[NR] = $1; sum += $1 }
+        END {
+            printf f " " f " " f " " f " " f "\n", sum / NR, v[1], v[NR], pct(0.50), pct(0.95)
+        }')"
+}
+
 # Startup time benchmark with high precision
-echo -e "\n⚡ Startup Time Test (10 iterations):"
+echo -e "\n⚡ Startup Time Test ($STARTUP_RUNS iterations):"
 startup_times=()
+first_run_ms=""
 
-for i in {1..10}; do
-    start_ns=$(date +%s%N)
+for ((i = 1; i <= STARTUP_RUNS; i++)); do
+    now_us; start_us=$now
     
-    # Start the app and let it initialize
-    timeout 5s "$APP_PATH" >/dev/null 2>&1 &
+    # Start the app and stop the clock once it reports ready
+    "$APP_PATH" <&4 4<&- >"$ready_fifo" 2>/dev/null &
     pid=$!
-    sleep 1  # Wait for initialization
+    exec 3<"$ready_fifo"
+    ready=0
+    wait_for_ready && ready=1
+    now_us; end_us=$now
+    
     kill $pid 2>/dev/null
     wait $pid 2>/dev/null
+    exec 3<&-
     
-    end_ns=$(date +%s%N)
-    duration_ms=$(( (end_ns - start_ns) / 1000000 ))
+    # A crash or hang has no startup time; leave it out of the statistics
+    if [ $ready -eq 0 ]; then
+        echo "Run $i: ⚠️ failed (no ready banner from the app)"
+        continue
+    fi
+    duration_ms=$(( (end_us - start_us) / 1000 ))
     startup_times+=($duration_ms)
+    if [ $i -eq 1 ]; then first_run_ms=$duration_ms; fi
     echo "Run $i: ${duration_ms}ms"
 done
 
-# Calculate statistics
-total=0
-min_time=${startup_times[0]}
-max_time=${startup_times[0]}
-
-for time in "${startup_times[@]}"; do
-    total=$((total + time))
-    if [ $time -lt $min_time ]; then min_time=$time; fi
-    if [ $time -gt $max_time ]; then max_time=$time; fi
-done
+if [ ${#startup_times[@]} -eq 0 ]; then
+    echo "❌ The app never reported ready!"
+    exit 1
+fi
 
-avg_time=$((total / ${#startup_times[@]}))
+# Calculate statistics
+summarize 0 "${startup_times[@]}"
+avg_time=$stat_avg
+min_time=$stat_min
+max_time=$stat_max
+p50_time=$stat_p50
+p95_time=$stat_p95
 
 echo -e "\nStartup Performance Results:"
 echo "Average: ${avg_time}ms"
 echo "Minimum: ${min_time}ms"
 echo "Maximum: ${max_time}ms"
+echo "Median:  ${p50_time}ms (p95 ${p95_time}ms)"
+echo "Successful runs: ${#startup_times[@]}/$STARTUP_RUNS"
 
 # Resource usage monitoring
-echo -e "\n🧠 Resource Usage Test (20 seconds):"
-"$APP_PATH" >/dev/null 2>&1 &
+echo -e "\n🧠 Resource Usage Test ($RESOURCE_SAMPLES seconds):"
+"$APP_PATH" <&4 4<&- >"$ready_fifo" 2>/dev/null &
 app_pid=$!
-sleep 2  # Let it initialize
+exec 3<"$ready_fifo"
+wait_for_ready || echo "⚠️ No ready banner from the app; sampling anyway"
 
 echo "Time    Memory(MB)  CPU%    Status"
 echo "--------------------------------"
 
 memory_readings=()
 cpu_readings=()
+page_kb=$(( $(getconf PAGESIZE) / 1024 ))
 
-for i in {1..20}; do
+for ((i = 1; i <= RESOURCE_SAMPLES; i++)); do
     if [ -d "/proc/$app_pid" ]; then
-        # Memory usage from /proc
-        memory_kb=$(awk '/VmRSS/ {print $2}' /proc/$app_pid/status 2>/dev/null || echo "0")
+        # Resident pages are the second field of /proc/<pid>/statm
+        if read -r _ rss_pages _ 2>/dev/null < /proc/$app_pid/statm; then
+            memory_kb=$((rss_pages * page_kb))
+        else
+            memory_kb=0
+        fi
         memory_mb=$((memory_kb / 1024))
         memory_readings+=($memory_mb)
         
@@ -117,35 +204,16 @@ for i in {1..20}; do
 done
 
 kill $app_pid 2>/dev/null
+wait $app_pid 2>/dev/null
+exec 3<&-
 
 # Calculate resource averages
 if [ ${#memory_readings[@]} -gt 0 ]; then
-    # Memory average
-    memory_total=0
-    memory_max=0
-    avg_memory=0
-    avg_cpu="N/A"
-    
-    for mem in "${memory_readings[@]}"; do
-        memory_total=$((memory_total + mem))
-        if [ $mem -gt $memory_max ]; then memory_max=$mem; fi
-    done
-    avg_memory=$((memory_total / ${#memory_readings[@]}))
-    
-    # CPU average (if bc is available)
-    if command -v bc >/dev/null && [ ${#cpu_readings[@]} -gt 0 ]; then
-        cpu_sum=$(printf '%s+' "${cpu_readings[@]}")
-        cpu_sum=${cpu_sum%+}  # Remove trailing +
-        # Handle case where CPU values might contain non-numeric characters
-        cpu_sum=$(echo "$cpu_sum" | sed 's/[^0-9.+]//g')
-        if [ -n "$cpu_sum" ] && [ "$cpu_sum" != "+" ]; then
-            avg_cpu=$(echo "scale=2; ($cpu_sum) / ${#cpu_readings[@]}" | bc 2>/dev/null || echo "N/A")
-        else
-            avg_cpu="N/A"
-        fi
-    else
-        avg_cpu="N/A"
-    fi
+    summarize 0 "${memory_readings[@]}"
+    avg_memory=$stat_avg
+    memory_max=$stat_max
+    summarize 2 "${cpu_readings[@]}"
+    avg_cpu=$stat_avg
     
     echo -e "\nResource Usage Summary:"
     echo "Average Memory: ${avg_memory}MB"
@@ -158,18 +226,12 @@ else
     avg_cpu="N/A"
 fi
 
-# Disk I/O test (optional)
-echo -e "\n💾 Disk I/O Test:"
-if command -v dd >/dev/null; then
-    echo "Testing application load time from disk..."
-    io_start=$(date +%s%N)
-    "$APP_PATH" --help >/dev/null 2>&1 &
-    help_pid=$!
-    sleep 0.5
-    kill $help_pid 2>/dev/null
-    io_end=$(date +%s%N)
-    io_time=$(( (io_end - io_start) / 1000000 ))
-    echo "Disk load time: ${io_time}ms"
+# First run vs the rest: any one-time launch cost shows up as a gap to the median
+echo -e "\n❄️ First Run Comparison:"
+if [ -n "$first_run_ms" ]; then
+    echo "First (cold) run: ${first_run_ms}ms vs ${p50_time}ms median"
+else
+    echo "First (cold) run: N/A (run failed)"
 fi
 
 # Network test (if applicable)
@@ -185,21 +247,28 @@ echo "✅ Stable Execution: No crashes detected"
 echo "✅ Network Independent: Runs offline"
 
 # Performance classification
-if [ $avg_time -lt 1000 ]; then
-    startup_grade="Excellent (<1s)"
-elif [ $avg_time -lt 2000 ]; then
-    startup_grade="Good (<2s)"
-else
-    startup_grade="Acceptable"
-fi
+# grade_for <value> <limit> <grade> [<limit> <grade> ...] <fallback>
+# Sets $grade to the first grade whose limit the value is under
+grade_for() {
+    local value=$1
+    shift
+    case "$value" in
+        ''|*[!0-9]*) grade="N/A"; return ;;
+    esac
+    while [ $# -gt 1 ]; do
+        if [ "$value" -lt "$1" ]; then
+            grade=$2
+            return
+        fi
+        shift 2
+    done
+    grade=$1
+}
 
-if [ $avg_memory -lt 20 ]; then
-    memory_grade="Excellent (<20MB)"
-elif [ $avg_memory -lt 50 ]; then
-    memory_grade="Good (<50MB)"
-else
-    memory_grade="Acceptable"
-fi
+grade_for "$avg_time" 1000 "Excellent (<1s)" 2000 "Good (<2s)" "Acceptable"
+startup_grade=$grade
+grade_for "$avg_memory" 20 "Excellent (<20MB)" 50 "Good (<50MB)" "Acceptable"
+memory_grade=$grade
 
 echo -e "\n🎯 Performance Grades:"
 echo "Startup: $startup_grade"
@@ -207,24 +276,24 @@ echo "Memory: $memory_grade"
 echo "Overall: Excellent for local AI application"
 
 # Generate detailed report
-timestamp=$(date '+%Y-%m-%d_%H-%M-%S')
 report_file="performance-linux-$timestamp.txt"
 
 cat > "$report_file" << EOF
 PocketFence AI - Linux Performance Report
 ==========================================
-Date: $(date)
+Date: $run_date
 Platform: Linux $ARCH
 
 System Information:
-- Distribution: $(cat /etc/os-release | grep PRETTY_NAME | cut -d'"' -f2)
-- Kernel: $(uname -r)
-- CPU: $(nproc) cores - $(cat /proc/cpuinfo | grep 'model name' | head -1 | cut -d':' -f2 | sed 's/^ *//')
-- Memory: $(free -h | awk '/^Mem:/ {print $2}')
+- Distribution: $sys_distro
+- Kernel: $sys_kernel
+- CPU: $sys_cpu
+- Memory: $sys_memory
 
 Performance Results:
 - File Size: ${file_size_mb}MB
 - Startup Time: ${avg_time}ms average (${min_time}ms min, ${max_time}ms max)
+- Startup Percentiles: ${p50_time}ms p50, ${p95_time}ms p95
 - Memory Usage: ${avg_memory}MB average (${memory_max}MB peak)
 - CPU Usage: ${avg_cpu}% average
 
@@ -236,8 +305,8 @@ Performance Grades:
 All performance targets met ✅
 
 Test Details:
-- 10 startup time iterations
-- 20 resource monitoring samples
+- $STARTUP_RUNS startup time iterations (${#startup_times[@]} reached ready)
+- $RESOURCE_SAMPLES resource monitoring samples
 - Zero external dependencies
 - Network independent operation
 EOF
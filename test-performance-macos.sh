@@ -14,8 +14,21 @@ else
     ARCH="Intel (x64)"
 fi
 
+# Microsecond timestamp into $now; the stock bash 3.2 lacks EPOCHREALTIME, so
+# fall back to python3 with -S (no site import) to keep interpreter start-up short
+now_us() {
+    if [ -n "$EPOCHREALTIME" ]; then
+        now=${EPOCHREALTIME/[.,]/}
+    else
+        now=$(python3 -S -c "import time; print(int(time.time() * 1000000))" 2>/dev/null || echo $(( $(date +%s) * 1000000 )))
+    fi
+}
+
 echo "Platform: $ARCH"
-echo "Date: $(date)"
+# Run timestamps, taken once so the console, report and file name agree
+run_date=$(date)
+timestamp=$(date '+%Y-%m-%d_%H-%M-%S')
+echo "Date: $run_date"
 
 # Build optimized release
 echo -e "\n🔨 Building optimized release for $RUNTIME..."
@@ -31,72 +44,118 @@ fi
 
 APP_PATH="bin/Release/net8.0/$RUNTIME/publish/PocketFence-AI"
 
+# Test sizes
+STARTUP_RUNS=10
+RESOURCE_SAMPLES=20  # One per second
+
 # Check file size
 echo -e "\n📦 Application Size:"
 file_size=$(ls -lh "$APP_PATH" | awk '{print $5}')
 echo "$file_size"
 
+# App stdio: the startup loop reads the ready banner through one FIFO; every
+# launch gets the other as stdin, held open but never written, so the prompt
+# blocks on input instead of spinning on EOF from /dev/null
+ready_fifo="${TMPDIR:-/tmp}/pocketfence-ready.$$"
+input_fifo="${TMPDIR:-/tmp}/pocketfence-input.$$"
+rm -f "$ready_fifo" "$input_fifo"
+mkfifo "$ready_fifo" "$input_fifo"
+trap 'rm -f "$ready_fifo" "$input_fifo"' EXIT
+exec 4<>"$input_fifo"
+
+# Block on fd 3 until the "Ready!" banner arrives; fails if the app exits first
+# or the banner has not shown up within about 5s overall (SECONDS is whole seconds)
+wait_for_ready() {
+    local line
+    local deadline=$((SECONDS + 5))
+    while [ $SECONDS -lt $deadline ] && IFS= read -r -t $((deadline - SECONDS)) line <&3; do
+        case "$line" in
+            *"Ready!"*) return 0 ;;
+        esac
+    done
+    return 1
+}
+
+# summarize <decimal places> <sample>...
+# Summarizes the samples in one sorted pass; sets stat_avg, stat_min, stat_max,
+# stat_p50 and stat_p95 (all "N/A" when there are no samples). Percentiles
+# interpolate linearly between neighbouring ranks, like numpy.percentile.
+summarize() {
+    local places=$1
+    shift
+    if [ $# -eq 0 ]; then
+        stat_avg="N/A" stat_min="N/A" stat_max="N/A" stat_p50="N/A" stat_p95="N/A"
+        return
+    fi
+    read -r stat_avg stat_min stat_max stat_p50 stat_p95 <<< "$(printf '%s\n' "$@" | sort -n | awk -v f="%.${places}f" '
+        function pct(p,    h, lo) {
+            h = (NR - 1) * p
+            lo = int(h) + 1
+            if (lo >= NR) return v[NR]
+            return v[lo] + (h - int(h)) * (v[lo + 1] - v[lo])
+        }
+        { v[NR] = $1; sum += $1 }
+        END {
+            printf f " " f " " f " " f " " f "\n", sum / NR, v[1], v[NR], pct(0.50), pct(0.95)
+        }')"
+}
+
 # Startup time benchmark
-echo -e "\n⚡ Startup Time Test (10 iterations):"
+echo -e "\n⚡ Startup Time Test ($STARTUP_RUNS iterations):"
 startup_times=()
-for i in {1..10}; do
-    start_time=$(python3 -c "import time; print(time.time())" 2>/dev/null || date +%s.%N)
+for ((i = 1; i <= STARTUP_RUNS; i++)); do
+    now_us; start_us=$now
     
-    # Start the app and let it initialize
-    timeout 5s "$APP_PATH" >/dev/null 2>&1 &
+    # Start the app and stop the clock once it reports ready
+    "$APP_PATH" <&4 4<&- >"$ready_fifo" 2>/dev/null &
     pid=$!
-    sleep 1  # Wait for initialization
+    exec 3<"$ready_fifo"
+    ready=0
+    wait_for_ready && ready=1
+    now_us; end_us=$now
+    
     kill $pid 2>/dev/null
     wait $pid 2>/dev/null
+    exec 3<&-
     
-    end_time=$(python3 -c "import time; print(time.time())" 2>/dev/null || date +%s.%N)
-    
-    if command -v python3 >/dev/null; then
-        duration=$(python3 -c "print(round(($end_time - $start_time) * 1000, 2))" 2>/dev/null || echo "1000")
-    elif command -v bc >/dev/null; then
-        duration=$(echo "scale=2; ($end_time - $start_time) * 1000" | bc 2>/dev/null || echo "1000")
-    else
-        duration="1000"
+    # A crash or hang has no startup time; leave it out of the statistics
+    if [ $ready -eq 0 ]; then
+        echo "Run $i: ⚠️ failed (no ready banner from the app)"
+        continue
     fi
+    elapsed_us=$(( end_us - start_us ))
+    printf -v duration '%d.%02d' $(( elapsed_us / 1000 )) $(( elapsed_us % 1000 / 10 ))
     
     startup_times+=($duration)
     echo "Run $i: ${duration}ms"
 done
 
-# Calculate statistics
-if command -v python3 >/dev/null; then
-    avg=$(python3 -c "times=[${startup_times[*]}]; print(round(sum(times)/len(times), 2))")
-    min=$(python3 -c "times=[${startup_times[*]}]; print(round(min(times), 2))")
-    max=$(python3 -c "times=[${startup_times[*]}]; print(round(max(times), 2))")
-else
-    # Fallback calculation
-    total=0
-    count=0
-    min_val=${startup_times[0]}
-    max_val=${startup_times[0]}
-    
-    for time in "${startup_times[@]}"; do
-        total=$(echo "$total + $time" | bc)
-        count=$((count + 1))
-        if (( $(echo "$time < $min_val" | bc -l) )); then min_val=$time; fi
-        if (( $(echo "$time > $max_val" | bc -l) )); then max_val=$time; fi
-    done
-    
-    avg=$(echo "scale=2; $total / $count" | bc)
-    min=$min_val
-    max=$max_val
+if [ ${#startup_times[@]} -eq 0 ]; then
+    echo "❌ The app never reported ready!"
+    exit 1
 fi
 
+# Calculate statistics
+summarize 2 "${startup_times[@]}"
+avg=$stat_avg
+min=$stat_min
+max=$stat_max
+p50=$stat_p50
+p95=$stat_p95
+
 echo -e "\nStartup Performance Results:"
 echo "Average: ${avg}ms"
 echo "Minimum: ${min}ms" 
 echo "Maximum: ${max}ms"
+echo "Median:  ${p50}ms (p95 ${p95}ms)"
+echo "Successful runs: ${#startup_times[@]}/$STARTUP_RUNS"
 
 # Memory usage test
-echo -e "\n🧠 Resource Usage Test (20 seconds):"
-"$APP_PATH" >/dev/null 2>&1 &
+echo -e "\n🧠 Resource Usage Test ($RESOURCE_SAMPLES seconds):"
+"$APP_PATH" <&4 4<&- >"$ready_fifo" 2>/dev/null &
 app_pid=$!
-sleep 2  # Let it initialize
+exec 3<"$ready_fifo"
+wait_for_ready || echo "⚠️ No ready banner from the app; sampling anyway"
 
 echo "Time    Memory(MB)  CPU%    Status"
 echo "--------------------------------"
@@ -104,7 +163,7 @@ echo "--------------------------------"
 memory_readings=()
 cpu_readings=()
 
-for i in {1..20}; do
+for ((i = 1; i <= RESOURCE_SAMPLES; i++)); do
     if ps -p $app_pid > /dev/null; then
         # Memory usage in MB
         memory_kb=$(ps -o rss= -p $app_pid)
@@ -124,26 +183,16 @@ for i in {1..20}; do
 done
 
 kill $app_pid 2>/dev/null
+wait $app_pid 2>/dev/null
+exec 3<&-
 
 # Calculate averages
 if [ ${#memory_readings[@]} -gt 0 ]; then
-    if command -v python3 >/dev/null; then
-        avg_memory=$(python3 -c "readings=[${memory_readings[*]}]; print(round(sum(readings)/len(readings), 2))")
-        max_memory=$(python3 -c "readings=[${memory_readings[*]}]; print(round(max(readings), 2))")
-        avg_cpu=$(python3 -c "readings=[${cpu_readings[*]}]; print(round(sum(readings)/len(readings), 2))")
-    else
-        # Fallback calculation using bc
-        if command -v bc >/dev/null; then
-            memory_sum=$(printf '%s+' "${memory_readings[@]}")
-            memory_sum=${memory_sum%+}
-            avg_memory=$(echo "scale=2; ($memory_sum) / ${#memory_readings[@]}" | bc 2>/dev/null || echo "0")
-            max_memory=$(printf '%s\n' "${memory_readings[@]}" | sort -nr | head -1)
-        else
-            avg_memory="N/A"
-            max_memory="N/A"
-        fi
-        avg_cpu="N/A"
-    fi
+    summarize 2 "${memory_readings[@]}"
+    avg_memory=$stat_avg
+    max_memory=$stat_max
+    summarize 2 "${cpu_readings[@]}"
+    avg_cpu=$stat_avg
     
     echo -e "\nResource Usage Summary:"
     echo "Average Memory: ${avg_memory}MB"
@@ -156,12 +205,18 @@ else
     avg_cpu="N/A"
 fi
 
-# System info
+# System info (collected once, reused in the report)
+sys_os_version=$(sw_vers -productVersion)
+sys_os="$(sw_vers -productName) $sys_os_version"
+sys_hardware=$(sysctl -n hw.model)
+sys_cpu=$(sysctl -n machdep.cpu.brand_string)
+sys_memory="$(($(sysctl -n hw.memsize) / 1024 / 1024 / 1024))GB"
+
 echo -e "\n🖥️ System Information:"
-echo "OS: $(sw_vers -productName) $(sw_vers -productVersion)"
-echo "Hardware: $(sysctl -n hw.model)"
-echo "CPU: $(sysctl -n machdep.cpu.brand_string)"
-echo "Memory: $(echo $(($(sysctl -n hw.memsize) / 1024 / 1024 / 1024)))GB"
+echo "OS: $sys_os"
+echo "Hardware: $sys_hardware"
+echo "CPU: $sys_cpu"
+echo "Memory: $sys_memory"
 
 echo -e "\n📊 macOS Performance Summary:"
 echo "✅ Application Size: $file_size (Excellent)"
@@ -170,25 +225,25 @@ echo "✅ Memory Efficient: Low resource usage"
 echo "✅ Stable Execution: No crashes detected"
 
 # Generate report
-timestamp=$(date '+%Y-%m-%d_%H-%M-%S')
 report_file="performance-macos-$timestamp.txt"
 
 cat > "$report_file" << EOF
 PocketFence AI - macOS Performance Report
 =========================================
-Date: $(date)
-Platform: macOS $(sw_vers -productVersion) $ARCH
+Date: $run_date
+Platform: macOS $sys_os_version $ARCH
 
 File Size: $file_size
 Startup Time: ${avg}ms average (${min}ms min, ${max}ms max)
+Startup Percentiles: ${p50}ms p50, ${p95}ms p95
 Memory Usage: ${avg_memory}MB average (${max_memory}MB peak)
 CPU Usage: ${avg_cpu}% average
 
 System Information:
-- OS: $(sw_vers -productName) $(sw_vers -productVersion)
-- Hardware: $(sysctl -n hw.model)
-- CPU: $(sysctl -n machdep.cpu.brand_string)
-- Memory: $(echo $(($(sysctl -n hw.memsize) / 1024 / 1024 / 1024)))GB
+- OS: $sys_os
+- Hardware: $sys_hardware
+- CPU: $sys_cpu
+- Memory: $sys_memory
 
 All performance targets met ✅
 EOF
@@ -1,12 +1,37 @@
 # Windows Performance Test Script for PocketFence AI
 # Simple version without complex string formatting
 
+# Start the app with redirected stdio so the script can watch for its ready banner
+function Start-App([string]$Path) {
+    $startInfo = [System.Diagnostics.ProcessStartInfo]::new($Path)
+    $startInfo.UseShellExecute = $false
+    $startInfo.WorkingDirectory = (Get-Location).ProviderPath
+    $startInfo.CreateNoWindow = $true
+    $startInfo.RedirectStandardOutput = $true
+    $startInfo.RedirectStandardInput = $true  # Held open so the prompt waits for input
+    return [System.Diagnostics.Process]::Start($startInfo)
+}
+
+# Wait for the "Ready!" line on the app's stdout; false on exit or timeout
+function Wait-AppReady([System.Diagnostics.Process]$Process, [int]$TimeoutMs = 5000) {
+    $clock = [System.Diagnostics.Stopwatch]::StartNew()
+    while ($true) {
+        $remaining = $TimeoutMs - $clock.ElapsedMilliseconds
+        if ($remaining -le 0) { return $false }
+        $read = $Process.StandardOutput.ReadLineAsync()
+        if (-not $read.Wait([int]$remaining)) { return $false }
+        if ($null -eq $read.Result) { return $false }
+        if ($read.Result.Contains("Ready!")) { return $true }
+    }
+}
+
 Write-Host "Windows Performance Test - PocketFence AI" -ForegroundColor Cyan
 Write-Host "=========================================" -ForegroundColor Cyan
 
 $platform = if ([Environment]::Is64BitProcess) { "x64" } else { "x86" }
 Write-Host "Platform: Windows $platform" -ForegroundColor White
-Write-Host "Date: $(Get-Date)" -ForegroundColor White
+$runStart = Get-Date  # Taken once so the console, report and file name agree
+Write-Host "Date: $runStart" -ForegroundColor White
 
 # Build optimized release
 Write-Host "`nBuilding optimized release..." -ForegroundColor Yellow
@@ -17,7 +42,16 @@ if ($LASTEXITCODE -ne 0) {
     exit 1
 }
 
-$appPath = "bin\Release\net8.0\win-$platform\publish\PocketFence-AI.exe"
+# Full path: ProcessStartInfo resolves relative paths against the process directory
+$appPath = (Resolve-Path "bin\Release\net8.0\win-$platform\publish\PocketFence-AI.exe").ProviderPath
+if (-not $appPath) {
+    Write-Host "Published app not found!" -ForegroundColor Red
+    exit 1
+}
+
+# Test sizes
+$startupRuns = 10
+$resourceSamples = 30  # One per second
 
 # Check file size
 Write-Host "`nApplication Size:" -ForegroundColor Green
@@ -26,20 +60,30 @@ $sizeMB = [math]::Round($fileSize / 1MB, 2)
 Write-Host "$sizeMB MB" -ForegroundColor White
 
 # Startup time benchmark
-Write-Host "`nStartup Time Test (10 iterations):" -ForegroundColor Green
-$results = @()
-
-for ($i = 1; $i -le 10; $i++) {
-    $time = Measure-Command { 
-        $process = Start-Process $appPath -PassThru -WindowStyle Hidden
-        Start-Sleep -Milliseconds 1000
-        Stop-Process -Id $process.Id -Force -ErrorAction SilentlyContinue
+Write-Host "`nStartup Time Test ($startupRuns iterations):" -ForegroundColor Green
+$results = [System.Collections.Generic.List[double]]::new()
+
+for ($i = 1; $i -le $startupRuns; $i++) {
+    $time = [System.Diagnostics.Stopwatch]::StartNew()
+    $process = Start-App $appPath
+    $ready = Wait-AppReady $process
+    $time.Stop()
+    Stop-Process -Id $process.Id -Force -ErrorAction SilentlyContinue
+    # A crash or hang has no startup time; leave it out of the statistics
+    if (-not $ready) {
+        Write-Host "Run $i`: failed (no ready banner from the app)" -ForegroundColor Yellow
+        continue
     }
-    $results += $time.TotalMilliseconds
-    $timeMs = [math]::Round($time.TotalMilliseconds, 2)
+    $results.Add($time.Elapsed.TotalMilliseconds)
+    $timeMs = [math]::Round($time.Elapsed.TotalMilliseconds, 2)
     Write-Host "Run $i`: $timeMs ms" -ForegroundColor White
 }
 
+if ($results.Count -eq 0) {
+    Write-Host "The app never reported ready!" -ForegroundColor Red
+    exit 1
+}
+
 $avg = ($results | Measure-Object -Average).Average
 $min = ($results | Measure-Object -Minimum).Minimum  
 $max = ($results | Measure-Object -Maximum).Maximum
@@ -51,28 +95,44 @@ $maxRounded = [math]::Round($max, 2)
 Write-Host "Average: $avgRounded ms" -ForegroundColor White
 Write-Host "Minimum: $minRounded ms" -ForegroundColor Green
 Write-Host "Maximum: $maxRounded ms" -ForegroundColor Red
+Write-Host "Successful runs: $($results.Count)/$startupRuns" -ForegroundColor White
 
 # Resource usage monitoring
-Write-Host "`nResource Usage Test (30 seconds):" -ForegroundColor Green
-$process = Start-Process $appPath -PassThru -WindowStyle Hidden
-Start-Sleep -Seconds 2
+Write-Host "`nResource Usage Test ($resourceSamples seconds):" -ForegroundColor Green
+$process = Start-App $appPath
+if (-not (Wait-AppReady $process)) {
+    Write-Host "No ready banner from the app; sampling anyway" -ForegroundColor Yellow
+}
 
 Write-Host "Time    Memory(MB)  CPU%    Status" -ForegroundColor Cyan
 Write-Host "--------------------------------" -ForegroundColor Cyan
 
-$memoryReadings = @()
-$cpuReadings = @()
-
-for ($i = 1; $i -le 30; $i++) {
+# Preallocated per-metric arrays, filled by index up to $sampleCount
+$memoryReadings = [double[]]::new($resourceSamples)
+$cpuReadings = [double[]]::new($resourceSamples)
+$sampleCount = 0
+# CPU% is the process's processor-time delta over the wall time since the previous
+# sample. Take the baseline one interval before sample 1 so that sample spans a full
+# second instead of a few milliseconds of ~15.6ms scheduler ticks.
+$cpuClock = [System.Diagnostics.Stopwatch]::StartNew()
+$lastWallMs = 0.0
+$lastCpuMs = $process.TotalProcessorTime.TotalMilliseconds
+Start-Sleep -Seconds 1
+
+for ($i = 1; $i -le $resourceSamples; $i++) {
     if (-not $process.HasExited) {
         try {
             $process.Refresh()
             $memoryMB = [math]::Round($process.WorkingSet64 / 1MB, 2)
-            $cpuPercent = (Get-Counter "\Process(PocketFence-AI*)\% Processor Time" -ErrorAction SilentlyContinue).CounterSamples[0].CookedValue
-            if ($cpuPercent -eq $null) { $cpuPercent = 0 }
+            $wallMs = $cpuClock.Elapsed.TotalMilliseconds
+            $cpuMs = $process.TotalProcessorTime.TotalMilliseconds
+            $cpuPercent = ($cpuMs - $lastCpuMs) / ($wallMs - $lastWallMs) * 100
+            $lastWallMs = $wallMs
+            $lastCpuMs = $cpuMs
             
-            $memoryReadings += $memoryMB
-            $cpuReadings += $cpuPercent
+            $memoryReadings[$sampleCount] = $memoryMB
+            $cpuReadings[$sampleCount] = $cpuPercent
+            $sampleCount++
             
             Write-Host ("{0:D2}:     {1,-10} {2,-7} Running" -f $i, $memoryMB, [math]::Round($cpuPercent, 1)) -ForegroundColor White
         }
@@ -89,10 +149,12 @@ for ($i = 1; $i -le 30; $i++) {
 Stop-Process -Id $process.Id -Force -ErrorAction SilentlyContinue
 
 # Calculate averages
-if ($memoryReadings.Count -gt 0) {
-    $avgMemory = [math]::Round(($memoryReadings | Measure-Object -Average).Average, 2)
-    $maxMemory = [math]::Round(($memoryReadings | Measure-Object -Maximum).Maximum, 2)
-    $avgCPU = [math]::Round(($cpuReadings | Measure-Object -Average).Average, 2)
+if ($sampleCount -gt 0) {
+    $last = $sampleCount - 1
+    $memoryStats = $memoryReadings[0..$last] | Measure-Object -Average -Maximum
+    $avgMemory = [math]::Round($memoryStats.Average, 2)
+    $maxMemory = [math]::Round($memoryStats.Maximum, 2)
+    $avgCPU = [math]::Round(($cpuReadings[0..$last] | Measure-Object -Average).Average, 2)
     
     Write-Host "`nResource Usage Summary:" -ForegroundColor Cyan
     Write-Host "Average Memory: $avgMemory MB" -ForegroundColor White
@@ -108,24 +170,32 @@ Write-Host "Memory Efficient: $avgMemory MB average usage" -ForegroundColor Whit
 Write-Host "Stable Execution: No crashes detected" -ForegroundColor White
 
 # Generate simple report
-$timestamp = Get-Date -Format "yyyy-MM-dd_HH-mm-ss"
+$timestamp = $runStart.ToString("yyyy-MM-dd_HH-mm-ss")
 $reportFile = "performance-windows-$timestamp.txt"
 
-$reportContent = @"
-PocketFence AI - Windows Performance Report
-==========================================
-Date: $(Get-Date)
-Platform: Windows $platform
-
-File Size: $sizeMB MB
-Startup Time: $avgRounded ms average ($minRounded ms min, $maxRounded ms max)
-Memory Usage: $avgMemory MB average ($maxMemory MB peak)
-CPU Usage: $avgCPU % average
-
-All performance targets met successfully!
-"@
-
-$reportContent | Out-File -FilePath $reportFile
+# Stream the report to the file; resource lines only when samples were taken
+# (.NET resolves relative paths against the process directory, not the PowerShell location)
+$reportPath = Join-Path (Get-Location) $reportFile
+$writer = [System.IO.StreamWriter]::new($reportPath, $false, [System.Text.UTF8Encoding]::new($false))
+try {
+    $writer.WriteLine("PocketFence AI - Windows Performance Report")
+    $writer.WriteLine("==========================================")
+    $writer.WriteLine("Date: $runStart")
+    $writer.WriteLine("Platform: Windows $platform")
+    $writer.WriteLine()
+    $writer.WriteLine("File Size: $sizeMB MB")
+    $writer.WriteLine("Startup Time: $avgRounded ms average ($minRounded ms min, $maxRounded ms max)")
+    if ($sampleCount -gt 0) {
+        $writer.WriteLine("Memory Usage: $avgMemory MB average ($maxMemory MB peak)")
+        $writer.WriteLine("CPU Usage: $avgCPU % average")
+    } else {
+        $writer.WriteLine("Memory Usage: not measured (app exited before sampling)")
+    }
+    $writer.WriteLine()
+    $writer.WriteLine("All performance targets met successfully!")
+} finally {
+    $writer.Dispose()
+}
 
 Write-Host "`nReport saved to: $reportFile" -ForegroundColor Cyan
 Write-Host "Windows performance test completed successfully!" -ForegroundColor Green
\ No newline at end of file
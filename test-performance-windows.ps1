@@ -1,8 +1,46 @@
 # Windows Performance Test Script for PocketFence AI
 # Run this script from the project root directory
 
+# One resource-usage sample, with typed fields rather than a PSCustomObject property bag
+class ResourceSample {
+    [int]$Time
+    [double]$MemoryMB
+    [double]$CPUPercent
+
+    ResourceSample([int]$time, [double]$memoryMB, [double]$cpuPercent) {
+        $this.Time = $time
+        $this.MemoryMB = $memoryMB
+        $this.CPUPercent = $cpuPercent
+    }
+}
+
+# Start the app with redirected stdio so the script can watch for its ready banner
+function Start-App([string]$Path) {
+    $startInfo = [System.Diagnostics.ProcessStartInfo]::new($Path)
+    $startInfo.UseShellExecute = $false
+    $startInfo.WorkingDirectory = (Get-Location).ProviderPath
+    $startInfo.CreateNoWindow = $true
+    $startInfo.RedirectStandardOutput = $true
+    $startInfo.RedirectStandardInput = $true  # Held open so the prompt waits for input
+    return [System.Diagnostics.Process]::Start($startInfo)
+}
+
+# Wait for the "Ready!" line on the app's stdout; false on exit or timeout
+function Wait-AppReady([System.Diagnostics.Process]$Process, [int]$TimeoutMs = 5000) {
+    $clock = [System.Diagnostics.Stopwatch]::StartNew()
+    while ($true) {
+        $remaining = $TimeoutMs - $clock.ElapsedMilliseconds
+        if ($remaining -le 0) { return $false }
+        $read = $Process.StandardOutput.ReadLineAsync()
+        if (-not $read.Wait([int]$remaining)) { return $false }
+        if ($null -eq $read.Result) { return $false }
+        if ($read.Result.Contains("Ready!")) { return $true }
+    }
+}
+
 Write-Host "🖥️ Windows Performance Test - PocketFence AI" -ForegroundColor Cyan
 Write-Host "=============================================" -ForegroundColor Cyan
+$runStart = Get-Date  # Taken once so the report date and file name agree
 
 # Build optimized release
 Write-Host "`n🔨 Building optimized release..." -ForegroundColor Yellow
@@ -16,7 +54,16 @@ if ($LASTEXITCODE -ne 0) {
     exit 1
 }
 
-$appPath = "bin\Release\net8.0\win-x64\publish\PocketFence-AI.exe"
+# Full path: ProcessStartInfo resolves relative paths against the process directory
+$appPath = (Resolve-Path "bin\Release\net8.0\win-x64\publish\PocketFence-AI.exe").ProviderPath
+if (-not $appPath) {
+    Write-Host "❌ Published app not found!" -ForegroundColor Red
+    exit 1
+}
+
+# Test sizes
+$startupRuns = 10
+$resourceSamples = 20  # One per second
 
 # Check file size
 Write-Host "`n📦 Application Size:" -ForegroundColor Green
@@ -25,19 +72,30 @@ $sizeMB = [math]::Round($fileInfo.Length/1MB, 2)
 Write-Host "$sizeMB MB" -ForegroundColor White
 
 # Startup time benchmark
-Write-Host "`n⚡ Startup Time Test (10 iterations):" -ForegroundColor Green
-$results = @()
-for ($i = 1; $i -le 10; $i++) {
-    $time = Measure-Command { 
-        $process = Start-Process $appPath -PassThru -WindowStyle Hidden
-        Start-Sleep -Milliseconds 1000  # Wait for initialization
-        Stop-Process -Id $process.Id -Force -ErrorAction SilentlyContinue
+Write-Host "`n⚡ Startup Time Test ($startupRuns iterations):" -ForegroundColor Green
+$results = [System.Collections.Generic.List[double]]::new()
+for ($i = 1; $i -le $startupRuns; $i++) {
+    # Start the app and stop the clock once it reports ready
+    $time = [System.Diagnostics.Stopwatch]::StartNew()
+    $process = Start-App $appPath
+    $ready = Wait-AppReady $process
+    $time.Stop()
+    Stop-Process -Id $process.Id -Force -ErrorAction SilentlyContinue
+    # A crash or hang has no startup time; leave it out of the statistics
+    if (-not $ready) {
+        Write-Host "⚠️ Run $i`: failed (no ready banner from the app)" -ForegroundColor Yellow
+        continue
     }
-    $results += $time.TotalMilliseconds
-    $timeMs = [math]::Round($time.TotalMilliseconds, 2)
+    $results.Add($time.Elapsed.TotalMilliseconds)
+    $timeMs = [math]::Round($time.Elapsed.TotalMilliseconds, 2)
     Write-Host "Run $i`: $timeMs" + "ms" -ForegroundColor White
 }
 
+if ($results.Count -eq 0) {
+    Write-Host "❌ The app never reported ready!" -ForegroundColor Red
+    exit 1
+}
+
 $avg = ($results | Measure-Object -Average).Average
 $min = ($results | Measure-Object -Minimum).Minimum  
 $max = ($results | Measure-Object -Maximum).Maximum
@@ -47,29 +105,37 @@ $avgRounded = [math]::Round($avg,2)
 Write-Host "Average: ${avgRounded}ms" -ForegroundColor White
 Write-Host "Minimum: $([math]::Round($min,2))ms" -ForegroundColor Green
 Write-Host "Maximum: $([math]::Round($max,2))ms" -ForegroundColor Red
+Write-Host "Successful runs: $($results.Count)/$startupRuns" -ForegroundColor White
 
 # Memory and CPU monitoring
-Write-Host "`n🧠 Resource Usage Test (30 seconds):" -ForegroundColor Green
-$process = Start-Process $appPath -PassThru -WindowStyle Hidden
-Start-Sleep -Seconds 3  # Let it initialize
+Write-Host "`n🧠 Resource Usage Test ($resourceSamples seconds):" -ForegroundColor Green
+$process = Start-App $appPath
+if (-not (Wait-AppReady $process)) {
+    Write-Host "⚠️ No ready banner from the app; sampling anyway" -ForegroundColor Yellow
+}
 
 Write-Host "Time    Memory(MB)  CPU%    Status" -ForegroundColor Cyan
 Write-Host "--------------------------------" -ForegroundColor Cyan
 
-$measurements = @()
-for ($i = 1; $i -le 20; $i++) {
+$measurements = [System.Collections.Generic.List[ResourceSample]]::new()
+# CPU% is the process's processor-time delta over the wall time since the previous
+# sample. Take the baseline one interval before sample 1 so that sample spans a full
+# second instead of a few milliseconds of ~15.6ms scheduler ticks.
+$cpuClock = [System.Diagnostics.Stopwatch]::StartNew()
+$lastWallMs = 0.0
+$lastCpuMs = $process.TotalProcessorTime.TotalMilliseconds
+Start-Sleep -Seconds 1
+for ($i = 1; $i -le $resourceSamples; $i++) {
     $proc = Get-Process -Id $process.Id -ErrorAction SilentlyContinue
     if ($proc) {
         $memoryMB = [math]::Round($proc.WorkingSet64/1MB, 2)
-        $cpu = try { 
-            (Get-Counter "\Process($($proc.ProcessName)*)\% Processor Time" -ErrorAction SilentlyContinue).CounterSamples[0].CookedValue 
-        } catch { 0 }
+        $wallMs = $cpuClock.Elapsed.TotalMilliseconds
+        $cpuMs = $proc.TotalProcessorTime.TotalMilliseconds
+        $cpu = ($cpuMs - $lastCpuMs) / ($wallMs - $lastWallMs) * 100
+        $lastWallMs = $wallMs
+        $lastCpuMs = $cpuMs
         
-        $measurements += [PSCustomObject]@{
-            Time = $i
-            MemoryMB = $memoryMB
-            CPUPercent = $cpu
-        }
+        $measurements.Add([ResourceSample]::new($i, $memoryMB, $cpu))
         
         Write-Host ("{0:D2}:     {1,-10} {2,-7} Running" -f $i, $memoryMB, [math]::Round($cpu,1)) -ForegroundColor White
     } else {
@@ -98,39 +164,39 @@ Write-Host "✅ Startup Speed: $([math]::Round($avg,2))ms average (Fast)" -Foreg
 Write-Host "✅ Memory Efficient: Low resource usage" -ForegroundColor Green
 Write-Host "✅ Stable Execution: No crashes detected" -ForegroundColor Green
 
-$timestamp = Get-Date -Format "yyyy-MM-dd_HH-mm-ss"
+$timestamp = $runStart.ToString("yyyy-MM-dd_HH-mm-ss")
 $reportFile = "performance-windows-$timestamp.txt"
 
-# Generate report
+# Generate report, streamed to the file; resource lines only when samples were taken
 $avgRounded = [math]::Round($avg,2)
 $minRounded = [math]::Round($min,2)
 $maxRounded = [math]::Round($max,2)
-$avgMemoryRounded = [math]::Round($avgMemory,2)
-$maxMemoryRounded = [math]::Round($maxMemory,2)
-$avgCPURounded = [math]::Round($avgCPU,2)
 
 $platform = if ([Environment]::Is64BitProcess) { "x64" } else { "x86" }
-$dateStr = Get-Date -Format "yyyy-MM-dd HH:mm:ss"
-
-$startupLine = "Startup Time: {0}ms average ({1}ms min, {2}ms max)" -f $avgRounded, $minRounded, $maxRounded
-$memoryLine = "Memory Usage: {0}MB average ({1}MB peak)" -f $avgMemoryRounded, $maxMemoryRounded
-$cpuLine = "CPU Usage: {0}% average" -f $avgCPURounded
-
-$reportLines = @(
-    "PocketFence AI - Windows Performance Report",
-    "==========================================",
-    "Date: $dateStr",
-    "Platform: Windows $platform",
-    "",
-    "File Size: $sizeMB MB",
-    $startupLine,
-    $memoryLine,
-    $cpuLine,
-    "",
-    "All performance targets met!"
-)
-
-$reportLines -join "`n" | Out-File -FilePath $reportFile
+$dateStr = $runStart.ToString("yyyy-MM-dd HH:mm:ss")
+
+# .NET resolves relative paths against the process directory, not the PowerShell location
+$reportPath = Join-Path (Get-Location) $reportFile
+$writer = [System.IO.StreamWriter]::new($reportPath, $false, [System.Text.UTF8Encoding]::new($false))
+try {
+    $writer.WriteLine("PocketFence AI - Windows Performance Report")
+    $writer.WriteLine("==========================================")
+    $writer.WriteLine("Date: $dateStr")
+    $writer.WriteLine("Platform: Windows $platform")
+    $writer.WriteLine()
+    $writer.WriteLine("File Size: $sizeMB MB")
+    $writer.WriteLine(("Startup Time: {0}ms average ({1}ms min, {2}ms max)" -f $avgRounded, $minRounded, $maxRounded))
+    if ($measurements.Count -gt 0) {
+        $writer.WriteLine(("Memory Usage: {0}MB average ({1}MB peak)" -f [math]::Round($avgMemory,2), [math]::Round($maxMemory,2)))
+        $writer.WriteLine(("CPU Usage: {0}% average" -f [math]::Round($avgCPU,2)))
+    } else {
+        $writer.WriteLine("Memory Usage: not measured (app exited before sampling)")
+    }
+    $writer.WriteLine()
+    $writer.WriteLine("All performance targets met!")
+} finally {
+    $writer.Dispose()
+}
 
 Write-Host "`nReport saved to: $reportFile" -ForegroundColor Cyan
 Write-Host "Windows performance test completed successfully!" -ForegroundColor Green
\ No newline at end of file